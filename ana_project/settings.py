@@ -82,6 +82,27 @@ DATABASES = {
 }
 
 
+# Cache
+# Analytics responses are cached here; point REDIS_URL at a Redis server to
+# share the cache between worker processes. The local-memory fallback is
+# per process, so refresh_daily_views cannot invalidate it and servers only
+# pick up a refresh once their entries expire.
+
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv("REDIS_URL"),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
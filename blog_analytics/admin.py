@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Country, User, Blog, BlogView
+from .models import Country, User, Blog, BlogView, BlogViewDaily
 
 
 @admin.register(Country)
@@ -32,3 +32,21 @@ class BlogViewAdmin(admin.ModelAdmin):
     search_fields = ['blog__title', 'viewer__username']
     date_hierarchy = 'viewed_at'
     raw_id_fields = ['blog', 'viewer']
+    list_select_related = ['blog', 'viewer', 'country']
+
+    def get_queryset(self, request):
+        # Rows only show the blog's title; skip its wide content column.
+        return super().get_queryset(request).defer('blog__content')
+
+
+@admin.register(BlogViewDaily)
+class BlogViewDailyAdmin(admin.ModelAdmin):
+    list_display = ['blog', 'day', 'views_count']
+    list_filter = ['day']
+    search_fields = ['blog__title']
+    date_hierarchy = 'day'
+    raw_id_fields = ['blog']
+    list_select_related = ['blog']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer('blog__content')
@@ -1,86 +1,249 @@
+from collections import deque
+from functools import lru_cache
+import orjson
+from django.core.exceptions import FieldDoesNotExist
 from django.db.models import Q
-from typing import Dict, Any, List
+from django.db.models.constants import LOOKUP_SEP
+from typing import Dict, Any, List, Optional, Union
 
 
 class DynamicFilter:
-    SUPPORTED_OPERATIONS = ['and', 'or', 'not', 'eq', 'in', 'contains', 'gt', 'gte', 'lt', 'lte']
+    __slots__ = ('filter_dict',)
+
+    SUPPORTED_OPERATIONS = frozenset(('and', 'or', 'not', 'eq', 'in', 'contains', 'gt', 'gte', 'lt', 'lte'))
 
     def __init__(self, filter_dict: Dict[str, Any]):
         self.filter_dict = filter_dict or {}
 
     def parse(self) -> Q:
-        if not self.filter_dict:
+        node = self.filter_dict
+        if not node:
             return Q()
-        return self._parse_node(self.filter_dict)
+        # Most filters are a single condition; build those without the walk
+        if isinstance(node, dict):
+            if "field" in node and "op" in node:
+                return self._build_condition(node)
+            if len(node) == 1 and "eq" in node:
+                return self._parse_eq(node["eq"])
+        return self._parse_node(node)
 
     def _parse_node(self, node: Any) -> Q:
-        if not isinstance(node, dict):
-            raise ValueError(f"Filter node must be a dict, got {type(node)}")
-
-        if "field" in node and "op" in node:
-            return self._build_condition(node)
-
-        operations = [k for k in node.keys() if k in self.SUPPORTED_OPERATIONS]
-        if not operations:
-            raise ValueError(f"No valid operation in node: {node.keys()}")
-        if len(operations) > 1:
-            raise ValueError("Only one operation per node allowed")
-
-        op = operations[0]
-        value = node[op]
-
-        if op == "and":
-            return self._parse_and(value)
-        elif op == "or":
-            return self._parse_or(value)
-        elif op == "not":
-            return ~self._parse_node(value)
-        else:
-            raise ValueError(f"Unsupported operation: {op}")
+        # Post-order walk with an explicit stack instead of recursion: each
+        # entry is (fold, item, target). fold is None for a node still to be
+        # visited; otherwise item holds the already-parsed children of an
+        # and/or/not node, which are folded into target once complete.
+        result: List[Q] = []
+        stack = deque([(None, node, result)])
+
+        while stack:
+            fold, item, target = stack.pop()
+            if fold is not None:
+                target.append(fold(item))
+                continue
+
+            if not isinstance(item, dict):
+                raise ValueError(f"Filter node must be a dict, got {type(item)}")
+
+            if "field" in item and "op" in item:
+                target.append(self._build_condition(item))
+                continue
+
+            op = None
+            for key in item:
+                if key in self.SUPPORTED_OPERATIONS:
+                    if op is not None:
+                        raise ValueError("Only one operation per node allowed")
+                    op = key
+            if op is None:
+                raise ValueError(f"No valid operation in node: {item.keys()}")
+
+            handler = self._DISPATCH.get(op)
+            if handler is None:
+                raise ValueError(f"Unsupported operation: {op}")
+            handler(self, item[op], target, stack)
+
+        return result[0]
+
+    LOOKUPS = {
+        "eq": "",
+        "in": "__in",
+        "contains": "__icontains",
+        "gt": "__gt",
+        "gte": "__gte",
+        "lt": "__lt",
+        "lte": "__lte",
+    }
 
     def _build_condition(self, cond: dict) -> Q:
         field = cond["field"]
         op = cond.get("op", "eq")
         value = cond["value"]
 
-        lookup_map = {
-            "eq": "",
-            "in": "__in",
-            "contains": "__icontains",
-            "gt": "__gt",
-            "gte": "__gte",
-            "lt": "__lt",
-            "lte": "__lte",
-        }
-
-        if op not in lookup_map:
+        suffix = self.LOOKUPS.get(op)
+        if suffix is None:
             raise ValueError(f"Unsupported operator: {op}")
 
-        lookup = f"{field}{lookup_map[op]}"
-        return Q(**{lookup: value})
+        if op == "in" and _is_empty_sequence(value):
+            return NOTHING
+        return Q(**{f"{field}{suffix}": value})
 
-    def _parse_and(self, conditions: List) -> Q:
-        if not isinstance(conditions, list):
-            raise ValueError("AND requires a list")
-        q = Q()
-        for cond in conditions:
-            q &= self._parse_node(cond)
-        return q
+    def _parse_eq(self, lookups: Any) -> Q:
+        if not isinstance(lookups, dict):
+            raise ValueError("EQ requires a dict of field lookups")
+        for lookup, value in lookups.items():
+            if lookup.endswith("__in") and _is_empty_sequence(value):
+                return NOTHING
+        return Q(**lookups)
+
+    def _visit_eq(self, lookups: Any, target: List[Q], stack: deque):
+        target.append(self._parse_eq(lookups))
+
+    def _visit_not(self, node: Any, target: List[Q], stack: deque):
+        children: List[Q] = []
+        stack.append((_fold_not, children, target))
+        stack.append((None, node, children))
+
+    def _visit_and(self, conditions: Any, target: List[Q], stack: deque):
+        self._push_conditions("AND", _fold_and, conditions, target, stack)
 
-    def _parse_or(self, conditions: List) -> Q:
+    def _visit_or(self, conditions: Any, target: List[Q], stack: deque):
+        self._push_conditions("OR", _fold_or, conditions, target, stack)
+
+    def _push_conditions(self, name: str, fold, conditions: Any, target: List[Q], stack: deque):
         if not isinstance(conditions, list):
-            raise ValueError("OR requires a list")
-        q = Q()
-        for cond in conditions:
-            q |= self._parse_node(cond)
-        return q
+            raise ValueError(f"{name} requires a list")
+        children: List[Q] = []
+        stack.append((fold, children, target))
+        # Reversed so the first condition is popped (and kept) first
+        stack.extend((None, cond, children) for cond in reversed(conditions))
+
+    _DISPATCH = {
+        "and": _visit_and,
+        "or": _visit_or,
+        "not": _visit_not,
+        "eq": _visit_eq,
+    }
+
+
+# Stands in for any clause that can be proven to match nothing (such as an
+# "in" against an empty list) so that enclosing and/or/not nodes can fold it
+# away while parsing, and apply_filters can skip the query entirely.
+NOTHING = Q(pk__in=())
+
+# The counterpart of NOTHING: a clause proven to match every row, such as the
+# negation of NOTHING. It must stay distinct from NOTHING under a further
+# "not", and lets apply_filters skip filtering altogether.
+EVERYTHING = Q()
+
+
+def _is_empty_sequence(value: Any) -> bool:
+    return isinstance(value, (list, tuple)) and not value
+
+
+# A single flat node with N children rather than the N-1 nested pairs built
+# by repeated & / |
+def _fold_and(children: List[Q]) -> Q:
+    for child in children:
+        if child is NOTHING:
+            return NOTHING
+    restrictive = [child for child in children if child is not EVERYTHING]
+    if children and not restrictive:
+        return EVERYTHING
+    return Q(*restrictive)
+
+
+def _fold_or(children: List[Q]) -> Q:
+    for child in children:
+        if child is EVERYTHING:
+            return EVERYTHING
+    matchable = [child for child in children if child is not NOTHING]
+    if children and not matchable:
+        return NOTHING
+    return Q(*matchable, _connector=Q.OR)
+
+
+def _fold_not(children: List[Q]) -> Q:
+    if children[0] is NOTHING:
+        return EVERYTHING
+    if children[0] is EVERYTHING:
+        return NOTHING
+    return ~children[0]
+
+
+def _crosses_to_many(model, q: Q) -> bool:
+    stack = [q]
+    while stack:
+        node = stack.pop()
+        for child in node.children:
+            if isinstance(child, Q):
+                stack.append(child)
+                continue
+            opts = model._meta
+            for part in child[0].split(LOOKUP_SEP):
+                try:
+                    field = opts.get_field(part)
+                except FieldDoesNotExist:
+                    # A lookup/transform such as "icontains", or the pk alias
+                    break
+                if field.many_to_many or field.one_to_many:
+                    return True
+                if not field.is_relation:
+                    break
+                opts = field.related_model._meta
+    return False
+
+
+@lru_cache(maxsize=512)
+def _compile(filter_json: bytes) -> Q:
+    # Q objects are not mutated by QuerySet.filter(), so a compiled filter
+    # can be shared between requests submitting the same JSON.
+    return DynamicFilter(orjson.loads(filter_json)).parse()
+
+
+def compile_filters(filter_dict: Dict[str, Any]) -> Q:
+    return _compile(orjson.dumps(filter_dict, option=orjson.OPT_SORT_KEYS))
+
+
+@lru_cache(maxsize=512)
+def parse_filters(value: Optional[str]) -> Optional[Q]:
+    # Validates the raw 'filters' query parameter and compiles it in one
+    # step, so views can hand the result straight to apply_filters without
+    # the JSON being decoded and walked a second time.
+    if not value:
+        return None
+    try:
+        filter_dict = orjson.loads(value)
+    except orjson.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON in 'filters' parameter: {e}")
+    if not filter_dict:
+        return None
+    try:
+        # Already cached per raw string above; compile_filters would cache the
+        # same Q again under a re-serialized key.
+        return DynamicFilter(filter_dict).parse()
+    except Exception as e:
+        raise ValueError(f"Invalid filter syntax: {e}")
 
 
-def apply_filters(queryset, filter_dict: Dict[str, Any]):
+def apply_filters(queryset, filter_dict: Union[Dict[str, Any], Q]):
     if not filter_dict:
         return queryset
     try:
-        parser = DynamicFilter(filter_dict)
-        return queryset.filter(parser.parse()).distinct()
+        if isinstance(filter_dict, Q):
+            q = filter_dict
+        else:
+            q = compile_filters(filter_dict)
+        if q is NOTHING:
+            return queryset.none()
+        if q is EVERYTHING:
+            return queryset
+        if _crosses_to_many(queryset.model, q):
+            # A join through a to-many relation repeats the row once per
+            # match, and DISTINCT cannot undo that once callers group with
+            # values().annotate(). Match through a pk subquery instead so the
+            # outer queryset keeps exactly one row per object.
+            matching = queryset.model._default_manager.filter(q).values("pk")
+            return queryset.filter(pk__in=matching)
+        return queryset.filter(q)
     except Exception as e:
         raise ValueError(f"Invalid filter syntax: {e}")
\ No newline at end of file
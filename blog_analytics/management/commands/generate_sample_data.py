@@ -2,12 +2,40 @@
 Django management command to generate sample data for testing analytics APIs.
 """
 import random
+import socket
+import struct
 from datetime import timedelta
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from django.utils import timezone
 from faker import Faker
 
-from blog_analytics.models import Country, User, Blog, BlogView
+from blog_analytics.models import Country, User, Blog, BlogView, BlogViewDaily
+
+VIEW_BATCH_SIZE = 1000
+MINUTES_PER_DAY = 24 * 60
+
+# Filler vocabulary for --fast, where realistic prose doesn't matter
+WORDS = tuple(
+    'lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod '
+    'tempor incididunt ut labore et dolore magna aliqua enim ad minim veniam '
+    'quis nostrud exercitation ullamco laboris nisi aliquip ex ea commodo '
+    'consequat duis aute irure in reprehenderit voluptate velit esse cillum '
+    'fugiat nulla pariatur excepteur sint occaecat cupidatat non proident sunt '
+    'culpa qui officia deserunt mollit anim id est laborum'.split()
+)
+
+
+def random_text(max_chars):
+    # Words average about six characters including the separator
+    text = ' '.join(random.choices(WORDS, k=max(1, max_chars // 6)))
+    return text[:max_chars - 1].rstrip().capitalize() + '.'
+
+
+def random_ipv4():
+    return socket.inet_ntoa(struct.pack('!I', random.getrandbits(32)))
 
 
 class Command(BaseCommand):
@@ -44,6 +72,11 @@ class Command(BaseCommand):
             default=365,
             help='Number of days of historical data (default: 365)'
         )
+        parser.add_argument(
+            '--fast',
+            action='store_true',
+            help='Use random filler instead of Faker for bios, blog content and IPs'
+        )
 
     def handle(self, *args, **options):
         fake = Faker()
@@ -54,15 +87,29 @@ class Command(BaseCommand):
         num_views = options['views']
         num_days = options['days']
         
+        if options['fast']:
+            make_text = random_text
+            make_ipv4 = random_ipv4
+        else:
+            make_text = lambda max_chars: fake.text(max_nb_chars=max_chars)
+            make_ipv4 = fake.ipv4
+        
+        # A single reference time for every generated timestamp
+        now = timezone.now()
+        
         self.stdout.write(self.style.WARNING('Clearing existing data...'))
-        BlogView.objects.all().delete()
-        Blog.objects.all().delete()
-        User.objects.all().delete()
-        Country.objects.all().delete()
+        with transaction.atomic():
+            # Clear blogs' dependants (raw views and their daily rollup) first,
+            # then the blogs themselves, skipping the collector and issuing a
+            # single DELETE for each table.
+            BlogView.objects.all()._raw_delete(BlogView.objects.db)
+            BlogViewDaily.objects.all()._raw_delete(BlogViewDaily.objects.db)
+            Blog.objects.all()._raw_delete(Blog.objects.db)
+            User.objects.all().delete()
+            Country.objects.all().delete()
         
         # Create countries
         self.stdout.write(self.style.SUCCESS(f'Creating {num_countries} countries...'))
-        countries = []
         country_data = [
             ('United States', 'US'),
             ('United Kingdom', 'GB'),
@@ -81,80 +128,99 @@ class Command(BaseCommand):
             ('Singapore', 'SG'),
         ]
         
-        for i in range(min(num_countries, len(country_data))):
-            name, code = country_data[i]
-            country = Country.objects.create(name=name, code=code)
-            countries.append(country)
+        countries = [
+            Country(name=name, code=code)
+            for name, code in country_data[:num_countries]
+        ]
+        with transaction.atomic():
+            Country.objects.bulk_create(countries)
         
         # Create users
         self.stdout.write(self.style.SUCCESS(f'Creating {num_users} users...'))
+        # Ensure uniqueness
+        usernames = [fake.user_name() + str(i) for i in range(num_users)]
+        emails = [fake.email() for _ in range(num_users)]
+        bios = [make_text(200) for _ in range(num_users)]
+        # Every sample user shares a password, so run the (deliberately slow)
+        # hasher once rather than per user
+        password = make_password('password123')
         users = []
-        for i in range(num_users):
-            user = User.objects.create_user(
-                username=fake.user_name() + str(i),  # Ensure uniqueness
-                email=fake.email(),
-                password='password123',
+        for username, email, bio in zip(usernames, emails, bios):
+            users.append(User(
+                username=username,
+                email=email,
                 country=random.choice(countries),
-                bio=fake.text(max_nb_chars=200),
-                is_active=random.choice([True, True, True, False])  # 75% active
-            )
-            # Set random creation date
-            days_ago = random.randint(0, num_days)
-            user.created_at = timezone.now() - timedelta(days=days_ago)
-            user.save()
-            users.append(user)
+                bio=bio,
+                is_active=random.choice([True, True, True, False]),  # 75% active
+                password=password,
+                created_at=now - timedelta(days=random.randint(0, num_days)),
+            ))
+        
+        with transaction.atomic():
+            User.objects.bulk_create(users, batch_size=500)
         
         # Create blogs
         self.stdout.write(self.style.SUCCESS(f'Creating {num_blogs} blogs...'))
+        titles = [fake.sentence(nb_words=6) for _ in range(num_blogs)]
+        contents = [make_text(1000) for _ in range(num_blogs)]
         blogs = []
-        for i in range(num_blogs):
+        for title, content in zip(titles, contents):
             author = random.choice(users)
-            blog = Blog.objects.create(
-                title=fake.sentence(nb_words=6),
-                content=fake.text(max_nb_chars=1000),
-                author=author,
-                country=author.country,
-                is_published=random.choice([True, True, True, False])  # 75% published
-            )
             # Set random creation date (after user creation)
-            max_days_ago = (timezone.now() - author.created_at).days
+            max_days_ago = (now - author.created_at).days
             if max_days_ago > 0:
                 days_ago = random.randint(0, min(max_days_ago, num_days))
             else:
                 days_ago = 0
-            blog.created_at = timezone.now() - timedelta(days=days_ago)
-            blog.save()
-            blogs.append(blog)
+            blogs.append(Blog(
+                title=title,
+                content=content,
+                author=author,
+                country=author.country,
+                created_at=now - timedelta(days=days_ago),
+                is_published=random.choice([True, True, True, False])  # 75% published
+            ))
+        
+        with transaction.atomic():
+            Blog.objects.bulk_create(blogs, batch_size=500)
         
         # Create blog views
         self.stdout.write(self.style.SUCCESS(f'Creating {num_views} blog views...'))
-        for i in range(num_views):
-            blog = random.choice(blogs)
-            viewer = random.choice(users + [None, None])  # Some anonymous views
-            
-            # Views should be after blog creation
-            max_days_ago = (timezone.now() - blog.created_at).days
-            if max_days_ago > 0:
-                days_ago = random.randint(0, min(max_days_ago, num_days))
-            else:
-                days_ago = 0
-            
-            view = BlogView.objects.create(
+        chosen_blogs = random.choices(blogs, k=num_views)
+        # Some anonymous views: None carries the weight of two users
+        chosen_viewers = random.choices(
+            users + [None],
+            weights=[1] * len(users) + [2],
+            k=num_views
+        )
+        chosen_ips = [make_ipv4() for _ in range(num_views)]
+        # Views should be after blog creation. Sampling a minute offset
+        # within the allowed window takes one RNG call per view instead of
+        # separate day/hour/minute draws.
+        view_windows = {
+            blog.pk: (max(min((now - blog.created_at).days, num_days), 0) + 1) * MINUTES_PER_DAY
+            for blog in blogs
+        }
+        views = []
+        for blog, viewer, ip_address in zip(chosen_blogs, chosen_viewers, chosen_ips):
+            views.append(BlogView(
                 blog=blog,
                 viewer=viewer,
                 country=viewer.country if viewer else random.choice(countries),
-                ip_address=fake.ipv4()
-            )
-            view.viewed_at = timezone.now() - timedelta(
-                days=days_ago,
-                hours=random.randint(0, 23),
-                minutes=random.randint(0, 59)
-            )
-            view.save()
-            
-            # Progress indicator
-            if (i + 1) % 1000 == 0:
-                self.stdout.write(f'  Created {i + 1}/{num_views} views...')
+                ip_address=ip_address,
+                viewed_at=now - timedelta(minutes=random.randrange(view_windows[blog.pk])),
+            ))
+        
+        with transaction.atomic():
+            for start in range(0, num_views, VIEW_BATCH_SIZE):
+                BlogView.objects.bulk_create(views[start:start + VIEW_BATCH_SIZE])
+                
+                # Progress indicator
+                created = min(start + VIEW_BATCH_SIZE, num_views)
+                self.stdout.write(f'  Created {created}/{num_views} views...')
+        
+        self.stdout.write(self.style.SUCCESS('Building daily view totals...'))
+        call_command('refresh_daily_views', stdout=self.stdout)
         
         # Summary
         self.stdout.write(self.style.SUCCESS('\n' + '='*50))
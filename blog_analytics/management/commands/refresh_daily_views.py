@@ -0,0 +1,59 @@
+"""
+Django management command to rebuild the BlogViewDaily rollup from BlogView.
+"""
+from datetime import datetime, time, timedelta
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from blog_analytics.models import BlogView, BlogViewDaily
+from blog_analytics.utils import bump_analytics_version
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = 'Rebuild daily per-blog view totals used by the analytics APIs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=None,
+            help='Only rebuild the most recent N days (default: rebuild everything)'
+        )
+
+    def handle(self, *args, **options):
+        num_days = options['days']
+        
+        views = BlogView.objects.order_by()
+        rollup = BlogViewDaily.objects.all()
+        if num_days is not None:
+            since = timezone.localdate() - timedelta(days=num_days)
+            views = views.filter(
+                viewed_at__gte=timezone.make_aware(datetime.combine(since, time.min))
+            )
+            rollup = rollup.filter(day__gte=since)
+        
+        totals = views.annotate(day=TruncDate('viewed_at')) \
+            .values('day', 'blog') \
+            .annotate(views_count=Count('*'))
+        
+        with transaction.atomic():
+            deleted, _ = rollup.delete()
+            created = BlogViewDaily.objects.bulk_create(
+                (
+                    BlogViewDaily(day=row['day'], blog_id=row['blog'], views_count=row['views_count'])
+                    for row in totals.iterator(chunk_size=BATCH_SIZE)
+                ),
+                batch_size=BATCH_SIZE
+            )
+        
+        # Cached analytics responses are keyed by this version
+        bump_analytics_version()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Replaced {deleted} daily totals with {len(created)} rows'
+        ))
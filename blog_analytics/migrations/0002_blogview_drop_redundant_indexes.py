@@ -0,0 +1,38 @@
+# Generated by Django 5.0.14 on 2026-10-15 21:46
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_analytics', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='blogview',
+            name='blog_analyt_country_d0963a_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='blogview',
+            name='blog_analyt_viewer__e05633_idx',
+        ),
+        migrations.AlterField(
+            model_name='blogview',
+            name='blog',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='views', to='blog_analytics.blog'),
+        ),
+        migrations.AlterField(
+            model_name='blogview',
+            name='country',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='blog_views', to='blog_analytics.country'),
+        ),
+        migrations.AlterField(
+            model_name='blogview',
+            name='viewer',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='viewed_blogs', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0.14 on 2026-10-15 21:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_analytics', '0004_user_created_at_default'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlogViewDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('views_count', models.PositiveIntegerField(default=0)),
+                ('blog', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='daily_views', to='blog_analytics.blog')),
+            ],
+            options={
+                'verbose_name_plural': 'Blog view daily totals',
+                'ordering': ['-day'],
+                'indexes': [models.Index(fields=['day'], name='blog_analyt_day_736aad_idx'), models.Index(fields=['blog', 'day'], include=('views_count',), name='blogviewdaily_blog_day_cover')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='blogviewdaily',
+            constraint=models.UniqueConstraint(fields=('blog', 'day'), name='blogviewdaily_blog_day_unique'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.0.14 on 2026-10-15 21:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_analytics', '0005_blogviewdaily'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='blogview',
+            name='blog_analyt_viewed__46758f_idx',
+        ),
+        migrations.AddIndex(
+            model_name='blogview',
+            index=models.Index(fields=['viewed_at', 'blog'], name='blog_analyt_viewed__5c42d1_idx'),
+        ),
+    ]
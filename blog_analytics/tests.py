@@ -0,0 +1,130 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .filters import apply_filters
+from .models import Blog, BlogView, Country, User
+from .utils import get_analytics_version
+
+
+class ToManyFilterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        us = Country.objects.create(name="United States", code="US")
+        gb = Country.objects.create(name="United Kingdom", code="GB")
+        author = User.objects.create(username="author", country=gb)
+        cls.blogs = [
+            Blog.objects.create(title=f"Blog {i}", content="...", author=author)
+            for i in range(2)
+        ]
+
+        now = timezone.now()
+        # Several matching views per blog, so a plain join would repeat rows
+        for blog in cls.blogs:
+            for _ in range(3):
+                BlogView.objects.create(blog=blog, country=us, viewed_at=now)
+            BlogView.objects.create(blog=blog, country=gb, viewed_at=now)
+        call_command("refresh_daily_views", stdout=StringIO())
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_apply_filters_keeps_one_row_per_object(self):
+        qs = apply_filters(Blog.objects.all(), {"field": "views__country__code", "op": "eq", "value": "US"})
+        self.assertEqual(qs.count(), len(self.blogs))
+
+    def test_blog_views_counts_each_blog_once(self):
+        response = self.client.get("/analytics/blog-views/", {
+            "object_type": "country",
+            "filters": '{"field": "views__country__code", "op": "in", "value": ["US"]}',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [{"x": "United Kingdom", "y": 2, "z": 8}])
+
+    def test_daily_performance_counts_each_blog_once(self):
+        response = self.client.get("/analytics/performance/", {
+            "compare": "day",
+            "filters": '{"field": "views__country__code", "op": "in", "value": ["US"]}',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row["x"].split(" ", 1)[1] for row in response.json()], ["(2 blogs)"])
+
+
+class DateRangeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_explicit_dates_are_accepted(self):
+        response = self.client.get("/analytics/top/", {
+            "top": "user", "start_date": "2026-01-01", "end_date": "2026-12-31",
+        })
+        self.assertEqual(response.status_code, 200)
+
+    def test_start_after_end_is_rejected(self):
+        response = self.client.get("/analytics/top/", {
+            "top": "user", "start_date": "2026-12-31", "end_date": "2026-01-01",
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"error": "start_date cannot be after end_date"})
+
+
+class FilterFoldingTests(TestCase):
+    EMPTY_IN = {"field": "id", "op": "in", "value": []}
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create(username="author")
+        cls.kept = Blog.objects.create(title="kept", content="...", author=author)
+        Blog.objects.create(title="other", content="...", author=author)
+
+    def assertMatches(self, filter_dict, expected):
+        qs = apply_filters(Blog.objects.all(), filter_dict)
+        self.assertEqual(set(qs.values_list("title", flat=True)), set(expected))
+
+    def test_not_of_empty_in_matches_everything(self):
+        self.assertMatches({"not": self.EMPTY_IN}, ["kept", "other"])
+
+    def test_double_not_of_empty_in_matches_nothing(self):
+        self.assertMatches({"not": {"not": self.EMPTY_IN}}, [])
+
+    def test_not_of_empty_in_inside_and(self):
+        title = {"field": "title", "op": "eq", "value": "kept"}
+        self.assertMatches({"and": [{"not": self.EMPTY_IN}, title]}, ["kept"])
+        self.assertMatches({"not": {"and": [{"not": self.EMPTY_IN}]}}, [])
+
+    def test_not_of_empty_in_inside_or(self):
+        title = {"field": "title", "op": "eq", "value": "kept"}
+        self.assertMatches({"or": [{"not": self.EMPTY_IN}, title]}, ["kept", "other"])
+        self.assertMatches({"not": {"or": [{"not": self.EMPTY_IN}, title]}}, [])
+
+
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        author = User.objects.create(username="author")
+        self.blog = Blog.objects.create(title="Blog", content="...", author=author)
+
+    def add_view_and_refresh(self, **refresh_options):
+        BlogView.objects.create(blog=self.blog, viewed_at=timezone.now())
+        call_command("refresh_daily_views", stdout=StringIO(), **refresh_options)
+
+    def test_refresh_bumps_the_analytics_version(self):
+        before = get_analytics_version()
+        call_command("refresh_daily_views", stdout=StringIO())
+        self.assertNotEqual(get_analytics_version(), before)
+
+    def test_refresh_invalidates_cached_responses(self):
+        self.add_view_and_refresh()
+        first = self.client.get("/analytics/top/", {"top": "blog"}).json()
+        self.assertEqual(first[0]["z"], 1)
+
+        self.add_view_and_refresh(days=1)
+        second = self.client.get("/analytics/top/", {"top": "blog"}).json()
+        self.assertEqual(second[0]["z"], 2)
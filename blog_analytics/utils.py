@@ -1,88 +1,95 @@
+import time
 from datetime import datetime, timedelta
+from types import MappingProxyType
+from django.core.cache import cache
 from django.utils import timezone
 from django.db.models.functions import TruncMonth, TruncWeek, TruncDay, TruncYear
-from typing import Tuple, Optional
+from typing import List, Optional, Sequence, Tuple
 
 
-def get_date_range(range_type: str) -> Tuple[datetime, datetime]:
-    now = timezone.now()
-    
-    if range_type == 'month':
+_RANGE_DAYS = {
+    'month': 30,
+    'week': 7,
+    'year': 365,
+}
 
-        start_date = now - timedelta(days=30)
-    elif range_type == 'week':
-        
-        start_date = now - timedelta(days=7)
-    elif range_type == 'year':
 
-        start_date = now - timedelta(days=365)
-    else:
+def get_date_range(range_type: str) -> Tuple[datetime, datetime]:
+    days = _RANGE_DAYS.get(range_type)
+    if days is None:
         raise ValueError(f"Invalid range type: {range_type}. Must be 'month', 'week', or 'year'")
     
-    return start_date, now
+    now = timezone.now()
+    return now - timedelta(days=days), now
+
+
+_TRUNC_FUNCTIONS = MappingProxyType({
+    'month': TruncMonth,
+    'week': TruncWeek,
+    'day': TruncDay,
+    'year': TruncYear,
+})
 
 
 def get_trunc_function(compare_type: str):
-    
-    trunc_map = {
-        'month': TruncMonth,
-        'week': TruncWeek,
-        'day': TruncDay,
-        'year': TruncYear,
-    }
-    
-    if compare_type not in trunc_map:
+    try:
+        return _TRUNC_FUNCTIONS[compare_type]
+    except KeyError:
         raise ValueError(
             f"Invalid compare type: {compare_type}. "
-            f"Must be one of: {', '.join(trunc_map.keys())}"
+            f"Must be one of: {', '.join(_TRUNC_FUNCTIONS.keys())}"
         )
-    
-    return trunc_map[compare_type]
 
 
-def calculate_growth_percentage(current: float, previous: float) -> str:
-    
-    if previous == 0:
-        if current == 0:
-            return "0.0%"
-        else:
-            return "+100.0%"  
-    
-    percentage = ((current - previous) / previous) * 100
-
-    if percentage >= 0:
-        return f"+{percentage:.1f}%"
-    else:
-        return f"{percentage:.1f}%"
-
-
-def format_period_label(date: datetime, compare_type: str, blog_count: int) -> str:
-    if compare_type == 'month':
-        period = date.strftime('%Y-%m')
-    elif compare_type == 'week':
-        period = date.strftime('%Y-W%U') 
-    elif compare_type == 'day':
-        period = date.strftime('%Y-%m-%d')
-    elif compare_type == 'year':
-        period = date.strftime('%Y')
-    else:
-        period = str(date)
+def calculate_growth_percentages(currents: Sequence[float], previous: Sequence[float]) -> List[str]:
+    # Growth for a whole period series, evaluated in one comprehension rather
+    # than a function call per period. With no previous views there is no
+    # meaningful percentage: "N/A" when nothing happened, "+∞%" otherwise.
+    return [
+        ("N/A" if cur == 0 else "+∞%") if prev == 0
+        else "%+.1f%%" % ((cur - prev) / prev * 100)
+        for cur, prev in zip(currents, previous)
+    ]
+
+
+# Formatting the date attributes directly avoids strftime's format parsing;
+# only the Sunday-based %U week number still goes through strftime.
+_PERIOD_FORMATTERS = {
+    'month': lambda date: f"{date.year:04d}-{date.month:02d}",
+    'week': lambda date: date.strftime('%Y-W%U'),
+    'day': lambda date: f"{date.year:04d}-{date.month:02d}-{date.day:02d}",
+    'year': lambda date: f"{date.year:04d}",
+}
+
+
+def format_period_label(date: datetime, compare_type: str, blog_count: int,
+                        period: Optional[str] = None) -> str:
+    # ``period`` is the already formatted date when the database rendered it.
+    if period is None:
+        formatter = _PERIOD_FORMATTERS.get(compare_type)
+        period = formatter(date) if formatter else str(date)
     
     blog_text = "blog" if blog_count == 1 else "blogs"
     return f"{period} ({blog_count} {blog_text})"
 
 
-def validate_range(range_type: Optional[str]) -> bool:
-    return range_type in ['month', 'week', 'year']
+RANGE_TYPES = frozenset(_RANGE_DAYS)
+COMPARE_TYPES = frozenset(_TRUNC_FUNCTIONS)
+OBJECT_TYPES = frozenset(('country', 'user'))
+TOP_TYPES = frozenset(('user', 'country', 'blog'))
 
 
-def validate_compare(compare_type: Optional[str]) -> bool:
-     return compare_type in ['month', 'week', 'day', 'year']
+ANALYTICS_VERSION_KEY = 'analytics:version'
 
 
-def validate_object_type(object_type: Optional[str]) -> bool:
-    return object_type in ['country', 'user']
+def get_analytics_version() -> int:
+    # Seeded from the clock so a version lost to eviction never comes back as
+    # one that older cached responses were stored under.
+    return cache.get_or_set(ANALYTICS_VERSION_KEY, time.time_ns, timeout=None)
 
 
-def validate_top_type(top_type: Optional[str]) -> bool:
-    return top_type in ['user', 'country', 'blog']
+def bump_analytics_version() -> None:
+    try:
+        cache.incr(ANALYTICS_VERSION_KEY)
+    except ValueError:
+        cache.set(ANALYTICS_VERSION_KEY, time.time_ns(), timeout=None)
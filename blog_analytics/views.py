@@ -1,47 +1,97 @@
-from django.db.models import Count, F, Value
-from django.db.models.functions import TruncDay, TruncWeek, TruncMonth, TruncYear
-from django.utils import timezone
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import CharField, Count, F, Func, OuterRef, Subquery, Sum, Value, Window
+from django.db.models.functions import Lag
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
-from datetime import timedelta
-import json
-from .models import Blog
+from datetime import datetime, timezone
+from functools import wraps
+import hashlib
+from .models import Blog, BlogViewDaily
 from .serializers import BlogViewsSerializer, TopSerializer, PerformanceSerializer
-from .filters import apply_filters
-from .utils import calculate_growth_percentage, format_period_label
+from .filters import apply_filters, parse_filters
+from .utils import (
+    COMPARE_TYPES, OBJECT_TYPES, RANGE_TYPES, TOP_TYPES, calculate_growth_percentages,
+    format_period_label, get_analytics_version, get_date_range, get_trunc_function,
+)
 
 
-def safe_json_loads(value):
-    if not value:
-        return None
-    try:
-        return json.loads(value)
-    except json.JSONDecodeError as e:
-        raise ValueError(f"Invalid JSON in 'filters' parameter: {e}")
-
-
-def get_date_range(request):
+def get_request_date_range(request):
     start_str = request.query_params.get("start_date")
     end_str = request.query_params.get("end_date")
     range_type = request.query_params.get("range")
 
     if start_str and end_str:
-        from datetime import datetime
         try:
             start = datetime.fromisoformat(start_str.replace("Z", "+00:00"))
             end = datetime.fromisoformat(end_str.replace("Z", "+00:00"))
-            if start > end:
-                raise ValueError("start_date cannot be after end_date")
-            return start.replace(tzinfo=timezone.utc), end.replace(tzinfo=timezone.utc)
-        except Exception:
+        except ValueError:
             raise ValueError("Invalid date format. Use ISO 8601 (e.g. 2025-12-01)")
+        # Dates without an offset are taken as UTC
+        start = start.replace(tzinfo=timezone.utc) if start.tzinfo is None else start.astimezone(timezone.utc)
+        end = end.replace(tzinfo=timezone.utc) if end.tzinfo is None else end.astimezone(timezone.utc)
+        if start > end:
+            raise ValueError("start_date cannot be after end_date")
+        return start, end
+
+    # Unknown or missing ranges fall back to the last month
+    return get_date_range(range_type if range_type in RANGE_TYPES else "month")
 
-    now = timezone.now()
-    days = {"week": 7, "month": 30, "year": 365}.get(range_type, 30)
-    return now - timedelta(days=days), now
+
+def with_view_counts(queryset, start_date, end_date):
+    # Sum each blog's daily view totals in the window with a correlated
+    # subquery rather than joining raw views in, so every blog stays a single
+    # row and grouping can use plain COUNT/SUM instead of COUNT(DISTINCT id).
+    # This relies on apply_filters turning to-many filters into pk semi-joins.
+    views_in_range = BlogViewDaily.objects.filter(
+        blog=OuterRef("pk"),
+        day__gte=start_date.date(),
+        day__lte=end_date.date()
+    ).order_by().values("blog").annotate(count=Sum("views_count")).values("count")
+
+    return queryset.annotate(view_count=Subquery(views_in_range)).filter(view_count__gt=0)
+
+
+def get_limit_offset(request, default=10, maximum=100):
+    try:
+        limit = int(request.query_params.get("limit", default))
+        offset = int(request.query_params.get("offset", 0))
+    except ValueError:
+        raise ValueError("limit and offset must be integers")
+    if limit < 1 or offset < 0:
+        raise ValueError("limit must be positive and offset cannot be negative")
+    return min(limit, maximum), offset
+
+
+# to_char patterns matching format_period_label. Weeks stay in Python: the
+# Sunday-based %U week number has no to_char equivalent.
+PG_PERIOD_FORMATS = {"day": "YYYY-MM-DD", "month": "YYYY-MM", "year": "YYYY"}
+
+
+def cached_analytics(ttl=60):
+    # Cache successful responses per endpoint and query string. The analytics
+    # version is part of the key and refresh_daily_views bumps it, so a
+    # refresh moves dashboards onto fresh entries without explicit
+    # invalidation.
+    def decorator(get):
+        @wraps(get)
+        def wrapper(self, request, *args, **kwargs):
+            version = get_analytics_version()
+            key_source = repr((type(self).__name__, sorted(request.query_params.lists()), version))
+            key = "analytics:" + hashlib.blake2b(key_source.encode(), digest_size=16).hexdigest()
+
+            data = cache.get(key)
+            if data is not None:
+                return Response(data)
+
+            response = get(self, request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, response.data, ttl)
+            return response
+        return wrapper
+    return decorator
 
 
 class BlogViewsAPIView(APIView):
@@ -55,47 +105,47 @@ class BlogViewsAPIView(APIView):
         ],
         responses=BlogViewsSerializer(many=True)
     )
+    @cached_analytics()
     def get(self, request):
         object_type = request.query_params.get("object_type")
-        if object_type not in ["country", "user"]:
+        if object_type not in OBJECT_TYPES:
             return Response({"error": "object_type must be 'country' or 'user'"}, status=400)
 
         try:
-            start_date, end_date = get_date_range(request)
-            filter_dict = safe_json_loads(request.query_params.get("filters"))
-
-            qs = Blog.objects.filter(
-                views__viewed_at__gte=start_date,
-                views__viewed_at__lte=end_date
-            )
+            start_date, end_date = get_request_date_range(request)
+            filter_q = parse_filters(request.query_params.get("filters"))
 
-            if filter_dict:
-                qs = apply_filters(qs, filter_dict)
+            qs = Blog.objects.all()
+            if filter_q is not None:
+                qs = apply_filters(qs, filter_q)
+            qs = with_view_counts(qs, start_date, end_date)
 
             if object_type == "country":
                 results = qs.values(country_name=F("author__country__name")) \
                     .annotate(
-                        num_blogs=Count("id", distinct=True),
-                        total_views=Count("views")
-                    ).order_by("-total_views")
+                        num_blogs=Count("id"),
+                        total_views=Sum("view_count")
+                    ).order_by("-total_views") \
+                    .values_list("country_name", "num_blogs", "total_views")
 
                 data = [
-                    {"x": r["country_name"] or "Unknown", "y": r["num_blogs"], "z": r["total_views"]}
-                    for r in results
+                    {"x": name or "Unknown", "y": num_blogs, "z": total_views}
+                    for name, num_blogs, total_views in results.iterator(chunk_size=2000)
                 ]
             else:  # user
                 results = qs.values(username=F("author__username")) \
                     .annotate(
-                        num_blogs=Count("id", distinct=True),
-                        total_views=Count("views")
-                    ).order_by("-total_views")
+                        num_blogs=Count("id"),
+                        total_views=Sum("view_count")
+                    ).order_by("-total_views") \
+                    .values_list("username", "num_blogs", "total_views")
 
                 data = [
-                    {"x": r["username"] or "Anonymous", "y": r["num_blogs"], "z": r["total_views"]}
-                    for r in results
+                    {"x": name or "Anonymous", "y": num_blogs, "z": total_views}
+                    for name, num_blogs, total_views in results.iterator(chunk_size=2000)
                 ]
 
-            return Response(BlogViewsSerializer(data, many=True).data)
+            return Response(data)
 
         except ValueError as e:
             return Response({"error": str(e)}, status=400)
@@ -110,58 +160,62 @@ class TopAPIView(APIView):
             OpenApiParameter(name="start_date", required=False),
             OpenApiParameter(name="end_date", required=False),
             OpenApiParameter(name="filters", required=False),
+            OpenApiParameter(name="limit", type=OpenApiTypes.INT, required=False, description="Rows to return (default 10, max 100)"),
+            OpenApiParameter(name="offset", type=OpenApiTypes.INT, required=False, description="Rows to skip (default 0)"),
         ],
         responses=TopSerializer(many=True)
     )
+    @cached_analytics()
     def get(self, request):
         top_type = request.query_params.get("top")
-        if top_type not in ["user", "country", "blog"]:
+        if top_type not in TOP_TYPES:
             return Response({"error": "top must be user/country/blog"}, status=400)
 
         try:
-            start_date, end_date = get_date_range(request)
-            filter_dict = safe_json_loads(request.query_params.get("filters"))
+            start_date, end_date = get_request_date_range(request)
+            limit, offset = get_limit_offset(request)
+            filter_q = parse_filters(request.query_params.get("filters"))
 
-            base_qs = Blog.objects.filter(
-                views__viewed_at__gte=start_date,
-                views__viewed_at__lte=end_date
-            )
-
-            if filter_dict:
-                base_qs = apply_filters(base_qs, filter_dict)
+            base_qs = Blog.objects.all()
+            if filter_q is not None:
+                base_qs = apply_filters(base_qs, filter_q)
+            base_qs = with_view_counts(base_qs, start_date, end_date)
 
             if top_type == "country":
                 results = base_qs.values("author__country__name") \
-                    .annotate(blogs=Count("id", distinct=True), views=Count("views")) \
-                    .order_by("-views")[:10]
+                    .annotate(blogs=Count("id"), views=Sum("view_count")) \
+                    .order_by("-views", "author__country__name") \
+                    .values_list("author__country__name", "blogs", "views")[offset:offset + limit]
                 data = [
-                    {"x": r["author__country__name"] or "Unknown", "y": r["blogs"], "z": r["views"]}
-                    for r in results
+                    {"x": name or "Unknown", "y": str(blogs), "z": views}
+                    for name, blogs, views in results
                 ]
 
             elif top_type == "user":
                 results = base_qs.values("author__username") \
-                    .annotate(blogs=Count("id", distinct=True), views=Count("views")) \
-                    .order_by("-views")[:10]
+                    .annotate(blogs=Count("id"), views=Sum("view_count")) \
+                    .order_by("-views", "author__username") \
+                    .values_list("author__username", "blogs", "views")[offset:offset + limit]
                 data = [
-                    {"x": r["author__username"] or "Anonymous", "y": r["blogs"], "z": r["views"]}
-                    for r in results
+                    {"x": name or "Anonymous", "y": str(blogs), "z": views}
+                    for name, blogs, views in results
                 ]
 
             else: 
                 results = base_qs.values("title") \
                     .annotate(
                         author_name=F("author__username"), 
-                        views=Count("views")
+                        views=Sum("view_count")
                     ) \
-                    .order_by("-views")[:10]
+                    .order_by("-views", "title") \
+                    .values_list("title", "author_name", "views")[offset:offset + limit]
 
                 data = [
-                    {"x": r["title"], "y": r["author_name"] or "Anonymous", "z": r["views"]}
-                    for r in results
+                    {"x": title, "y": author_name or "Anonymous", "z": views}
+                    for title, author_name, views in results
                 ]
 
-            return Response(TopSerializer(data, many=True).data)
+            return Response(data)
 
         except ValueError as e:
             return Response({"error": str(e)}, status=400)
@@ -177,47 +231,57 @@ class PerformanceAPIView(APIView):
         ],
         responses=PerformanceSerializer(many=True)
     )
+    @cached_analytics()
     def get(self, request):
         compare = request.query_params.get("compare")
-        if compare not in ["day", "week", "month", "year"]:
+        if compare not in COMPARE_TYPES:
             return Response({"error": "compare must be day/week/month/year"}, status=400)
 
         try:
             user_id = request.query_params.get("user_id")
-            filter_dict = safe_json_loads(request.query_params.get("filters"))
+            filter_q = parse_filters(request.query_params.get("filters"))
 
-            Trunc = {"day": TruncDay, "week": TruncWeek, "month": TruncMonth, "year": TruncYear}[compare]
+            Trunc = get_trunc_function(compare)
 
             qs = Blog.objects.all()
             if user_id:
                 qs = qs.filter(author_id=user_id)
-            if filter_dict:
-                qs = apply_filters(qs, filter_dict)
+            if filter_q is not None:
+                qs = apply_filters(qs, filter_q)
 
-            current = qs.annotate(period=Trunc("views__viewed_at")) \
+            # Filtering on the rollup first turns the join into an INNER JOIN and
+            # keeps blogs without any views from producing a NULL period.
+            periods = qs.filter(daily_views__isnull=False) \
+                .annotate(period=Trunc("daily_views__day")) \
                 .values("period") \
                 .annotate(
-                    views=Count("views"),
-                    blogs_created=Count("id", distinct=True)
-                ).order_by("period")
-
-            shift_days = {"day": 1, "week": 7, "month": 30, "year": 365}[compare]
-            previous = qs.annotate(
-                period=Trunc(F("views__viewed_at") - Value(timedelta(days=shift_days)))
-            ).values("period").annotate(views=Count("views"))
-            prev_dict = {item["period"]: item["views"] for item in previous}
+                    views=Sum("daily_views__views_count"),
+                    # The rollup is the only to-many join here (apply_filters
+                    # semi-joins to-many filters) and (blog, day) is unique in
+                    # it, so only periods longer than a day can repeat a blog
+                    blogs_created=Count("id", distinct=compare != "day"),
+                ) \
+                .annotate(prev_views=Window(Lag("views", default=0), order_by=F("period").asc())) \
+                .order_by("period")
+
+            pg_format = PG_PERIOD_FORMATS.get(compare) if connection.vendor == "postgresql" else None
+            if pg_format:
+                periods = periods.annotate(
+                    label=Func(F("period"), Value(pg_format), function="to_char", output_field=CharField())
+                )
+
+            rows = list(periods)
+
+            growths = calculate_growth_percentages(
+                [item["views"] for item in rows], [item["prev_views"] for item in rows]
+            )
 
             data = []
-            for item in current:
-                prev = prev_dict.get(item["period"], 0)
-                if prev == 0:
-                    growth = "N/A" if item["views"] == 0 else "+∞%"
-                else:
-                    growth = calculate_growth_percentage(item["views"], prev)
-                label = format_period_label(item["period"], compare, item["blogs_created"])
+            for item, growth in zip(rows, growths):
+                label = format_period_label(item["period"], compare, item["blogs_created"], item.get("label"))
                 data.append({"x": label, "y": item["views"], "z": growth})
 
-            return Response(PerformanceSerializer(data, many=True).data)
+            return Response(data)
 
         except ValueError as e:
             return Response({"error": str(e)}, status=400)